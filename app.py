@@ -1,7 +1,16 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, make_response, render_template
+from werkzeug.exceptions import HTTPException
+import atexit
+import functools
+import hashlib
+import queue
 import sqlite3
-import json
+import threading
+import orjson
 import os
+import re
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
 app = Flask(__name__)
@@ -10,579 +19,893 @@ app = Flask(__name__)
 DATABASE = 'database_designer.db'
 DESIGN_DB = 'design_storage.db'
 
-def get_db_connection(db_file=DATABASE):
-    """获取数据库连接"""
-    conn = sqlite3.connect(db_file)
-    conn.row_factory = sqlite3.Row
+class SqlitePool:
+    """简易SQLite连接池
+
+    按数据库文件维护一个LIFO队列，复用连接以避免每个请求
+    重复打开db/-wal/-shm文件并重新执行调优PRAGMA。
+    """
+
+    def __init__(self, max_size=8):
+        self.max_size = max_size
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def _pool_for(self, db_file):
+        with self._lock:
+            pool = self._pools.get(db_file)
+            if pool is None:
+                pool = queue.LifoQueue(maxsize=self.max_size)
+                self._pools[db_file] = pool
+            return pool
+
+    def _create_connection(self, db_file):
+        conn = sqlite3.connect(db_file, isolation_level=None, timeout=5.0,
+                               check_same_thread=False, cached_statements=256)
+        # 默认返回元组：sqlite3.Row包装在大结果集上是纯Python开销，需要按名访问的调用方自行开启
+        # 连接级性能调优（journal_mode=WAL 在 init_databases 中设置一次，持久化在磁盘上）
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-64000')
+        conn.execute('PRAGMA mmap_size=30000000000')
+        conn.execute('PRAGMA busy_timeout=5000')
+        conn.execute('PRAGMA foreign_keys=ON')
+        # 主库连接同时挂载设计库：一个连接可以读写两个文件，
+        # 一次事务提交即可同时覆盖两边
+        if db_file == DATABASE:
+            conn.execute(f"ATTACH DATABASE '{DESIGN_DB}' AS design")
+        return conn
+
+    def acquire(self, db_file=DATABASE):
+        """取出一个空闲连接，池空时新建"""
+        try:
+            return self._pool_for(db_file).get_nowait()
+        except queue.Empty:
+            return self._create_connection(db_file)
+
+    def release(self, db_file, conn):
+        """归还连接，池满时直接关闭"""
+        conn.row_factory = None
+        try:
+            self._pool_for(db_file).put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextmanager
+    def connection(self, db_file=DATABASE):
+        """上下文管理器：with pool.connection(db_file) as conn: ..."""
+        conn = self.acquire(db_file)
+        try:
+            yield conn
+        finally:
+            self.release(db_file, conn)
+
+    @contextmanager
+    def transaction(self, db_file=DATABASE, conn=None):
+        """在一个BEGIN IMMEDIATE事务中执行
+
+        传入conn时直接复用调用方的连接（事务由调用方管理），
+        否则取一个池化连接，成功时提交、异常时回滚。
+        """
+        if conn is not None:
+            yield conn
+            return
+        with self.connection(db_file) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+
+    def drain(self):
+        """关闭池中所有空闲连接（进程退出时调用）"""
+        with self._lock:
+            pools = list(self._pools.values())
+        for p in pools:
+            while True:
+                try:
+                    p.get_nowait().close()
+                except queue.Empty:
+                    break
+
+pool = SqlitePool()
+atexit.register(pool.drain)
+
+def get_db_connection(db_file=DATABASE, row_factory=None):
+    """获取数据库连接（从连接池取出，用完需通过 pool.release 归还）
+
+    默认返回元组行；需要按名访问时传入row_factory=sqlite3.Row。
+    """
+    conn = pool.acquire(db_file)
+    if row_factory is not None:
+        conn.row_factory = row_factory
     return conn
 
+# 常量SQL文本可以命中sqlite的语句缓存，EXISTS在首行即短路
+_TABLE_EXISTS_SQL = "SELECT EXISTS(SELECT 1 FROM sqlite_master WHERE type='table' AND name=? LIMIT 1)"
+
+def table_exists(conn, table_name):
+    """检查表是否存在"""
+    return conn.execute(_TABLE_EXISTS_SQL, (table_name,)).fetchone()[0] == 1
+
+# 表名/字段名白名单：标识符直接拼进DDL，不能走参数绑定
+_IDENT_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]{0,63}$')
+
+def _validate_identifier(name):
+    """校验标识符，拒绝无法安全拼接进SQL的表名/字段名"""
+    if not name or not _IDENT_RE.match(name):
+        raise ValueError(f'非法的标识符: {name!r}')
+    return name
+
+@functools.lru_cache(maxsize=64)
+def _field_emitter(has_length, not_null, unique, has_default):
+    """按可选属性组合编译一个直线式的字段SQL生成函数
+
+    同一种属性组合只编译一次（lru_cache），之后生成片段时
+    不再逐属性走分支，省掉大部分每字段的解释器开销。
+    """
+    src = "def emit(f):\n    return f\"{f['name']} {f['type']}"
+    if has_length:
+        src += "({f['length']})"
+    if not_null:
+        src += " NOT NULL"
+    if unique:
+        src += " UNIQUE"
+    if has_default:
+        src += " DEFAULT {f['default']}"
+    src += "\"\n"
+    namespace = {}
+    exec(src, namespace)
+    return namespace['emit']
+
+def _field_sql(field):
+    """生成单个字段定义的SQL片段"""
+    get = field.get
+    _validate_identifier(field['name'])
+    emit = _field_emitter(bool(get('length')), not get('nullable', True),
+                          bool(get('unique')), bool(get('default')))
+    return emit(field)
+
 def init_databases():
     """初始化数据库"""
+    # 启用WAL日志模式（写入磁盘后对所有后续连接生效，只需设置一次）
+    for db_file in (DATABASE, DESIGN_DB):
+        with pool.connection(db_file) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+
     # 初始化设计存储数据库
-    conn = get_db_connection(DESIGN_DB)
-    c = conn.cursor()
-    
-    # 创建设计项目表
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS design_projects (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            description TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # 创建表设计表
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS table_designs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            project_id INTEGER,
-            table_name TEXT NOT NULL,
-            table_comment TEXT,
-            design_data TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (project_id) REFERENCES design_projects (id)
-        )
-    ''')
+    with pool.connection(DESIGN_DB) as conn:
+        c = conn.cursor()
     
-    conn.commit()
-    conn.close()
+        # 创建设计项目表
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS design_projects (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                description TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # 创建表设计表
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS table_designs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_id INTEGER,
+                table_name TEXT NOT NULL,
+                table_comment TEXT,
+                design_data TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (project_id) REFERENCES design_projects (id)
+            )
+        ''')
+
+        # 简化版表设计表（_design_save里也会按需建，这里提前建好以便加索引）
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS table_designs_simple (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT UNIQUE NOT NULL,
+                design_data TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # 覆盖索引：按table_name取design_data不用再回主表做rowid查找
+        c.execute('''
+            CREATE INDEX IF NOT EXISTS idx_td_cover
+            ON table_designs_simple(table_name, design_data)
+        ''')
+
+        # 让查询计划器了解索引的统计信息
+        c.execute('ANALYZE')
 
-def create_actual_table(table_design):
-    """根据设计创建实际的数据库表"""
-    try:
-        conn = get_db_connection(DATABASE)
-        c = conn.cursor()
-        
-        table_name = table_design['name']
-        
-        # 检查表是否已存在
-        c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-        if c.fetchone():
-            # 表已存在，先删除
-            c.execute(f"DROP TABLE {table_name}")
-        
-        # 构建创建表的SQL
-        sql = f"CREATE TABLE {table_name} ("
-        
-        fields_sql = []
-        primary_keys = []
-        
-        for field in table_design['fields']:
-            field_sql = f"{field['name']} {field['type']}"
-            
-            # 添加长度限制
-            if field.get('length'):
-                field_sql += f"({field['length']})"
-            
-            # 添加非空约束
-            if not field.get('nullable', True):
-                field_sql += " NOT NULL"
-            
-            # 添加唯一约束
-            if field.get('unique'):
-                field_sql += " UNIQUE"
-            
-            # 添加默认值
-            if field.get('default'):
-                field_sql += f" DEFAULT {field['default']}"
-            
-            fields_sql.append(field_sql)
-            
-            # 记录主键字段
-            if field.get('primary'):
-                primary_keys.append(field['name'])
-        
-        # 添加主键约束
-        if primary_keys:
-            fields_sql.append(f"PRIMARY KEY ({', '.join(primary_keys)})")
-        
-        sql += ", ".join(fields_sql)
-        sql += ")"
-        
-        # 执行创建表
-        c.execute(sql)
-        
-        # 添加表注释（SQLite不支持表注释，这里记录到设计表中）
-        if table_design.get('comment'):
-            save_table_comment(table_name, table_design['comment'])
-        
         conn.commit()
-        conn.close()
-        
+
+def _copy_rows(conn, src, dst, cols):
+    """在调用方的事务中用executemany把src表的指定列批量拷入dst表
+
+    SQLite的提交开销按事务而非按行计，批量插入必须放在同一事务里。
+    """
+    col_list = ', '.join(cols)
+    placeholders = ', '.join('?' * len(cols))
+    rows = conn.execute(f"SELECT {col_list} FROM {src}")
+    conn.executemany(f"INSERT INTO {dst} ({col_list}) VALUES ({placeholders})", rows)
+
+def create_actual_table(table_design, conn=None, preserve_data=False):
+    """根据设计创建实际的数据库表
+
+    传入conn时复用调用方的连接和事务，由调用方负责提交。
+    preserve_data=True时把旧表改名为<name>__tmp，建新表后在同一个
+    事务里拷回两边同名列的数据，最后删掉旧表。
+    """
+    try:
+        with pool.transaction(DATABASE, conn) as conn:
+            c = conn.cursor()
+
+            table_name = _validate_identifier(table_design['name'])
+
+            # 表已存在时：保数据则改名暂存，否则直接删除
+            old_tmp = None
+            if table_exists(conn, table_name):
+                if preserve_data:
+                    old_tmp = f"{table_name}__tmp"
+                    c.execute(f"DROP TABLE IF EXISTS {old_tmp}")
+                    c.execute(f"ALTER TABLE {table_name} RENAME TO {old_tmp}")
+                else:
+                    c.execute(f"DROP TABLE {table_name}")
+
+            # 构建创建表的SQL
+            fields = table_design['fields']
+            fields_sql = [_field_sql(field) for field in fields]
+            primary_keys = [field['name'] for field in fields if field.get('primary')]
+
+            # 添加主键约束
+            if primary_keys:
+                fields_sql.append(f"PRIMARY KEY ({', '.join(primary_keys)})")
+
+            sql = f"CREATE TABLE {table_name} ({', '.join(fields_sql)})"
+
+            # 执行创建表
+            c.execute(sql)
+
+            # 把新旧表同名列的数据拷回新表
+            if old_tmp:
+                old_cols = {row[1] for row in c.execute(f"PRAGMA table_info({old_tmp})")}
+                common = [field['name'] for field in fields if field['name'] in old_cols]
+                if common:
+                    _copy_rows(conn, old_tmp, table_name, common)
+                c.execute(f"DROP TABLE {old_tmp}")
+
+            # 添加表注释（SQLite不支持表注释，这里记录到设计表中，同一事务提交）
+            if table_design.get('comment'):
+                save_table_comment(table_name, table_design['comment'], conn=conn)
+
+        invalidate_structure_cache()
         return True, f"表 {table_name} 创建成功"
-        
+
     except Exception as e:
         return False, f"创建表失败: {str(e)}"
 
-def save_table_comment(table_name, comment):
-    """保存表注释到设计表"""
+def save_table_comment(table_name, comment, conn=None):
+    """保存表注释到设计表（经主库连接挂载的design库写入）"""
     try:
-        conn = get_db_connection(DESIGN_DB)
-        c = conn.cursor()
-        
-        c.execute('''
-            INSERT OR REPLACE INTO table_comments (table_name, comment)
-            VALUES (?, ?)
-        ''', (table_name, comment))
-        
-        conn.commit()
-        conn.close()
+        with pool.transaction(DATABASE, conn) as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO design.table_comments (table_name, comment)
+                VALUES (?, ?)
+            ''', (table_name, comment))
     except:
         # 如果表不存在，忽略错误
         pass
 
-def get_table_structure(table_name):
-    """获取表结构信息"""
-    try:
-        conn = get_db_connection(DATABASE)
-        c = conn.cursor()
-        
-        # 获取表信息
-        c.execute(f"PRAGMA table_info({table_name})")
-        columns = c.fetchall()
-        
-        # 获取索引信息（主键、唯一约束）
-        c.execute(f"PRAGMA index_list({table_name})")
-        indexes = c.fetchall()
-        
-        table_info = {
-            'name': table_name,
-            'columns': [],
-            'primary_keys': [],
-            'unique_constraints': []
+def _build_table_info(table_name, columns):
+    """根据PRAGMA table_info的行构建表结构字典"""
+    table_info = {
+        'name': table_name,
+        'columns': [],
+        'primary_keys': [],
+        'unique_constraints': []
+    }
+
+    for col in columns:
+        column_info = {
+            'name': col[1],
+            'type': col[2],
+            'nullable': not col[3],
+            'default_value': col[4],
+            'primary_key': col[5] == 1
         }
-        
-        for col in columns:
-            column_info = {
-                'name': col[1],
-                'type': col[2],
-                'nullable': not col[3],
-                'default_value': col[4],
-                'primary_key': col[5] == 1
-            }
-            table_info['columns'].append(column_info)
-            
-            if column_info['primary_key']:
-                table_info['primary_keys'].append(column_info['name'])
-        
-        conn.close()
-        return table_info
-        
+        table_info['columns'].append(column_info)
+
+        if column_info['primary_key']:
+            table_info['primary_keys'].append(column_info['name'])
+
+    return table_info
+
+def _db_mtime_ns():
+    """数据库文件的mtime，作为结构缓存的版本号"""
+    try:
+        return os.stat(DATABASE).st_mtime_ns
+    except OSError:
+        return 0
+
+@functools.lru_cache(maxsize=256)
+def _get_table_structure_cached(table_name, db_mtime_ns):
+    try:
+        with pool.connection(DATABASE) as conn:
+            c = conn.cursor()
+
+            # 获取表信息
+            c.execute(f"PRAGMA table_info({table_name})")
+            columns = c.fetchall()
+
+            # 获取索引信息（主键、唯一约束）
+            c.execute(f"PRAGMA index_list({table_name})")
+            indexes = c.fetchall()
+
+        return _build_table_info(table_name, columns)
+
     except Exception as e:
         return None
 
+def get_table_structure(table_name):
+    """获取表结构信息（按数据库文件mtime缓存，DDL后自动失效）"""
+    return _get_table_structure_cached(table_name, _db_mtime_ns())
+
+# /api/database-status 的短TTL缓存：(截止时间, 响应payload)
+_STATUS_TTL = 1.0
+_status_cache = (0.0, None)
+
+def invalidate_structure_cache():
+    """结构变更（建表/删表/字段操作）后清空结构缓存"""
+    global _status_cache
+    _get_table_structure_cached.cache_clear()
+    _status_cache = (0.0, None)
+
+def get_all_table_structures():
+    """一次查询批量获取所有用户表的结构
+
+    利用sqlite的表值函数pragma_table_info与sqlite_master做联接，
+    单个round trip拿到全部列信息，避免逐表执行PRAGMA。
+    """
+    with pool.connection(DATABASE) as conn:
+        rows = conn.execute('''
+            SELECT m.name, p.name, p.type, p."notnull", p.dflt_value, p.pk
+            FROM sqlite_master m JOIN pragma_table_info(m.name) p
+            WHERE m.type='table' AND m.name NOT LIKE 'sqlite_%'
+            ORDER BY m.rowid, p.cid
+        ''').fetchall()
+
+    table_list = []
+    current = None
+    for table_name, col_name, col_type, notnull, dflt_value, pk in rows:
+        if current is None or current['name'] != table_name:
+            current = {
+                'name': table_name,
+                'columns': [],
+                'primary_keys': [],
+                'unique_constraints': []
+            }
+            table_list.append(current)
+
+        current['columns'].append({
+            'name': col_name,
+            'type': col_type,
+            'nullable': not notnull,
+            'default_value': dflt_value,
+            'primary_key': pk == 1
+        })
+        if pk == 1:
+            current['primary_keys'].append(col_name)
+
+    return table_list
+
+# 统一的错误处理：各路由不再整段包try/except，异常路径少一层handler帧
+@app.errorhandler(sqlite3.Error)
+def _on_sqlite_error(e):
+    """SQLite错误统一转为JSON响应"""
+    return jsonify({'success': False, 'error': str(e)}), 400
+
+@app.errorhandler(Exception)
+def _on_unexpected_error(e):
+    """其它未捕获异常保持原有的JSON 500响应格式"""
+    if isinstance(e, HTTPException):
+        return e
+    return jsonify({'success': False, 'error': str(e)}), 500
+
+# 首页渲染结果缓存：(HTML字节串, ETag)
+_index_cache = None
+
 @app.route('/')
 def index():
-    """首页"""
-    return render_template('index.html')
+    """首页（模板只渲染一次，带ETag/Cache-Control让浏览器304短路）"""
+    global _index_cache
+    if _index_cache is None:
+        html = render_template('index.html').encode()
+        _index_cache = (html, hashlib.sha256(html).hexdigest()[:16])
+
+    html, etag = _index_cache
+    resp = make_response(html)
+    resp.headers['Content-Type'] = 'text/html; charset=utf-8'
+    resp.headers['Cache-Control'] = 'public, max-age=60'
+    resp.set_etag(etag)
+    return resp.make_conditional(request)
 
 # API路由 - 创建新表
 @app.route('/api/tables', methods=['POST'])
 def create_table():
     """根据设计创建新表"""
-    try:
-        data = request.json
-        table_design = data.get('table')
-        
-        if not table_design or not table_design.get('name'):
-            return jsonify({'success': False, 'error': '表设计数据不完整'}), 400
-        
-        # 创建实际的数据表
-        success, message = create_actual_table(table_design)
-        
-        if success:
-            # 保存设计到设计数据库
-            save_table_design(table_design)
-            return jsonify({'success': True, 'message': message})
-        else:
-            return jsonify({'success': False, 'error': message}), 400
-            
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    data = request.json
+    table_design = data.get('table')
 
-def save_table_design(table_design):
-    """保存表设计到设计数据库"""
-    try:
-        conn = get_db_connection(DESIGN_DB)
-        c = conn.cursor()
-        
-        # 创建表设计表（如果不存在）
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS table_designs_simple (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                table_name TEXT UNIQUE NOT NULL,
-                design_data TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 插入或更新设计数据
-        c.execute('''
-            INSERT OR REPLACE INTO table_designs_simple (table_name, design_data, updated_at)
-            VALUES (?, ?, CURRENT_TIMESTAMP)
-        ''', (table_design['name'], json.dumps(table_design, ensure_ascii=False)))
-        
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        print(f"保存设计数据失败: {e}")
+    if not table_design or not table_design.get('name'):
+        return jsonify({'success': False, 'error': '表设计数据不完整'}), 400
+
+    # 创建实际的数据表
+    success, message = create_actual_table(table_design)
+
+    if success:
+        # 保存设计到设计数据库
+        save_table_design(table_design)
+        return jsonify({'success': True, 'message': message})
+    else:
+        return jsonify({'success': False, 'error': message}), 400
+
+def _design_save(conn, table_design):
+    """在给定连接上保存表设计"""
+    # 创建表设计表（如果不存在）
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS table_designs_simple (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT UNIQUE NOT NULL,
+            design_data TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # 插入或更新设计数据
+    conn.execute('''
+        INSERT OR REPLACE INTO table_designs_simple (table_name, design_data, updated_at)
+        VALUES (?, ?, CURRENT_TIMESTAMP)
+    ''', (table_design['name'], orjson.dumps(table_design).decode()))
+
+def _design_delete(conn, table_name):
+    """在给定连接上删除表设计"""
+    conn.execute("DELETE FROM table_designs_simple WHERE table_name=?", (table_name,))
+
+def save_table_design(table_design, conn=None):
+    """保存表设计到设计数据库
+
+    默认入队交给后台写线程异步落库（请求路径不等设计库的fsync）；
+    传入conn时复用调用方的连接和事务同步执行。
+    """
+    if conn is not None:
+        _design_save(conn, table_design)
+    else:
+        _design_queue.put(('save', table_design))
 
 # API路由 - 更新表结构
 @app.route('/api/tables/<table_name>', methods=['PUT'])
 def update_table(table_name):
     """更新表结构"""
-    try:
-        data = request.json
-        table_design = data.get('table')
-        
-        if not table_design:
-            return jsonify({'success': False, 'error': '表设计数据不能为空'}), 400
-        
-        # 检查表是否存在
-        conn = get_db_connection(DATABASE)
-        c = conn.cursor()
-        c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-        if not c.fetchone():
-            conn.close()
+    data = request.json
+    table_design = data.get('table')
+
+    if not table_design:
+        return jsonify({'success': False, 'error': '表设计数据不能为空'}), 400
+
+    # 检查表是否存在
+    with pool.connection(DATABASE) as conn:
+        if not table_exists(conn, table_name):
             return jsonify({'success': False, 'error': f'表 {table_name} 不存在'}), 404
-        conn.close()
-        
-        # 由于SQLite的ALTER TABLE功能有限，这里采用删除重建的方式
-        # 在实际生产环境中，应该使用更复杂的迁移策略
-        
-        # 备份数据（这里简化处理，实际应该备份数据）
-        success, message = create_actual_table(table_design)
-        
-        if success:
-            # 更新设计数据
-            save_table_design(table_design)
-            return jsonify({'success': True, 'message': f'表 {table_name} 更新成功'})
-        else:
-            return jsonify({'success': False, 'error': message}), 400
-            
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+
+    # 由于SQLite的ALTER TABLE功能有限，这里采用改名-重建-拷回的方式，
+    # 同名列的数据在同一事务内保留
+    success, message = create_actual_table(table_design, preserve_data=True)
+
+    if success:
+        # 更新设计数据
+        save_table_design(table_design)
+        return jsonify({'success': True, 'message': f'表 {table_name} 更新成功'})
+    else:
+        return jsonify({'success': False, 'error': message}), 400
 
 # API路由 - 删除表
 @app.route('/api/tables/<table_name>', methods=['DELETE'])
 def delete_table(table_name):
     """删除表"""
-    try:
-        conn = get_db_connection(DATABASE)
+    with pool.transaction(DATABASE) as conn:
         c = conn.cursor()
-        
+
         # 检查表是否存在
-        c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-        if not c.fetchone():
-            conn.close()
+        if not table_exists(conn, table_name):
             return jsonify({'success': False, 'error': f'表 {table_name} 不存在'}), 404
-        
+
         # 删除表
         c.execute(f"DROP TABLE {table_name}")
-        
-        # 删除设计数据
-        conn_design = get_db_connection(DESIGN_DB)
-        c_design = conn_design.cursor()
-        c_design.execute("DELETE FROM table_designs_simple WHERE table_name=?", (table_name,))
-        conn_design.commit()
-        conn_design.close()
-        
-        conn.commit()
-        conn.close()
-        
-        return jsonify({'success': True, 'message': f'表 {table_name} 删除成功'})
-        
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+
+    # 删除设计数据（走写队列，保持与其它设计变更的先后顺序）
+    _design_queue.put(('delete', table_name))
+
+    invalidate_structure_cache()
+    return jsonify({'success': True, 'message': f'表 {table_name} 删除成功'})
 
 # API路由 - 获取所有表
 @app.route('/api/tables', methods=['GET'])
 def get_all_tables():
     """获取所有表信息"""
-    try:
-        conn = get_db_connection(DATABASE)
-        c = conn.cursor()
-        
-        # 获取所有表名
-        c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
-        tables = c.fetchall()
-        
-        table_list = []
-        for table in tables:
-            table_name = table[0]
-            table_info = get_table_structure(table_name)
-            if table_info:
-                table_list.append(table_info)
-        
-        conn.close()
-        return jsonify({'success': True, 'tables': table_list})
-        
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    return jsonify({'success': True, 'tables': get_all_table_structures()})
 
 # API路由 - 获取表详情
 @app.route('/api/tables/<table_name>', methods=['GET'])
 def get_table_detail(table_name):
     """获取表详细结构"""
-    try:
-        table_info = get_table_structure(table_name)
-        if not table_info:
-            return jsonify({'success': False, 'error': f'表 {table_name} 不存在'}), 404
-        
-        # 获取设计数据
-        conn = get_db_connection(DESIGN_DB)
+    table_info = get_table_structure(table_name)
+    if not table_info:
+        return jsonify({'success': False, 'error': f'表 {table_name} 不存在'}), 404
+
+    # 获取设计数据（主库连接上挂载的design库，无需再开一条连接）
+    flush_design_writes()
+    with pool.connection(DATABASE) as conn:
         c = conn.cursor()
-        c.execute("SELECT design_data FROM table_designs_simple WHERE table_name=?", (table_name,))
+        c.execute("SELECT design_data FROM design.table_designs_simple WHERE table_name=?", (table_name,))
         design_row = c.fetchone()
-        conn.close()
-        
-        design_data = None
-        if design_row:
-            design_data = json.loads(design_row[0])
-        
-        return jsonify({
-            'success': True, 
-            'table': table_info,
-            'design': design_data
-        })
-        
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+
+    design_data = None
+    if design_row:
+        design_data = orjson.loads(design_row[0])
+
+    return jsonify({
+        'success': True, 
+        'table': table_info,
+        'design': design_data
+    })
 
 # API路由 - 添加字段
 @app.route('/api/tables/<table_name>/fields', methods=['POST'])
 def add_field(table_name):
     """向表中添加字段"""
-    try:
-        data = request.json
-        field_design = data.get('field')
-        
-        if not field_design or not field_design.get('name'):
-            return jsonify({'success': False, 'error': '字段数据不完整'}), 400
-        
-        # 检查表是否存在
-        conn = get_db_connection(DATABASE)
+    data = request.json
+    field_design = data.get('field')
+
+    if not field_design or not field_design.get('name'):
+        return jsonify({'success': False, 'error': '字段数据不完整'}), 400
+
+    with pool.transaction(DATABASE) as conn:
         c = conn.cursor()
-        c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-        if not c.fetchone():
-            conn.close()
+
+        # 检查表是否存在
+        if not table_exists(conn, table_name):
             return jsonify({'success': False, 'error': f'表 {table_name} 不存在'}), 404
-        
-        # 构建添加字段的SQL
-        field_sql = f"ALTER TABLE {table_name} ADD COLUMN {field_design['name']} {field_design['type']}"
-        
-        if field_design.get('length'):
-            field_sql += f"({field_design['length']})"
-        
-        if not field_design.get('nullable', True):
-            field_sql += " NOT NULL"
-        
-        if field_design.get('unique'):
-            field_sql += " UNIQUE"
-        
-        if field_design.get('default'):
-            field_sql += f" DEFAULT {field_design['default']}"
-        
-        # 执行添加字段
-        c.execute(field_sql)
-        
-        conn.commit()
-        conn.close()
-        
-        # 更新设计数据
-        update_design_after_field_change(table_name, 'add', field_design)
-        
-        return jsonify({'success': True, 'message': f'字段 {field_design["name"]} 添加成功'})
-        
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
 
-def update_design_after_field_change(table_name, operation, field_data):
-    """在字段变更后更新设计数据"""
+        # 构建并执行添加字段的SQL
+        _validate_identifier(table_name)
+        c.execute(f"ALTER TABLE {table_name} ADD COLUMN {_field_sql(field_design)}")
+
+    invalidate_structure_cache()
+
+    # 更新设计数据
+    update_design_after_field_change(table_name, 'add', field_design)
+
+    return jsonify({'success': True, 'message': f'字段 {field_design["name"]} 添加成功'})
+
+def _has_json1():
     try:
-        conn = get_db_connection(DESIGN_DB)
-        c = conn.cursor()
-        
-        c.execute("SELECT design_data FROM table_designs_simple WHERE table_name=?", (table_name,))
-        design_row = c.fetchone()
-        
-        if design_row:
-            design_data = json.loads(design_row[0])
-            
-            if operation == 'add':
-                design_data['fields'].append(field_data)
-            elif operation == 'delete':
-                design_data['fields'] = [f for f in design_data['fields'] if f['name'] != field_data['name']]
-            elif operation == 'update':
-                for i, field in enumerate(design_data['fields']):
-                    if field['name'] == field_data['old_name']:
-                        design_data['fields'][i] = field_data
-                        break
-            
-            # 更新设计数据
-            c.execute('''
-                UPDATE table_designs_simple 
-                SET design_data = ?, updated_at = CURRENT_TIMESTAMP 
-                WHERE table_name = ?
-            ''', (json.dumps(design_data, ensure_ascii=False), table_name))
-            
+        sqlite3.connect(':memory:').execute("SELECT json('[]')")
+        return True
+    except sqlite3.Error:
+        return False
+
+_HAS_JSON1 = _has_json1()
+
+def _design_field_change_py(conn, table_name, operation, field_data):
+    """Python侧的字段变更改写（无JSON1时的回退路径）"""
+    c = conn.cursor()
+
+    c.execute("SELECT design_data FROM table_designs_simple WHERE table_name=?", (table_name,))
+    design_row = c.fetchone()
+
+    if design_row:
+        design_data = orjson.loads(design_row[0])
+
+        if operation == 'add':
+            design_data['fields'].append(field_data)
+        elif operation == 'delete':
+            design_data['fields'] = [f for f in design_data['fields'] if f['name'] != field_data['name']]
+        elif operation == 'update':
+            for i, field in enumerate(design_data['fields']):
+                if field['name'] == field_data['old_name']:
+                    design_data['fields'][i] = field_data
+                    break
+
+        # 更新设计数据
+        c.execute('''
+            UPDATE table_designs_simple
+            SET design_data = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE table_name = ?
+        ''', (orjson.dumps(design_data).decode(), table_name))
+
+def _design_field_change(conn, table_name, operation, field_data):
+    """在给定连接上应用字段变更到设计数据
+
+    有JSON1时直接用json_insert/json_remove/json_replace在SQL层
+    原地改写，省掉Python侧整份JSON的解析和再序列化。
+    目标字段不存在时coalesce到一个不存在的路径，保持原样不动。
+    """
+    if not _HAS_JSON1:
+        _design_field_change_py(conn, table_name, operation, field_data)
+        return
+
+    if operation == 'add':
+        conn.execute('''
+            UPDATE table_designs_simple
+            SET design_data = json_insert(design_data, '$.fields[#]', json(?)),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE table_name = ?
+        ''', (orjson.dumps(field_data).decode(), table_name))
+    elif operation == 'delete':
+        # 用过滤后的json_group_array整体重建fields，与Python回退一致地删除所有同名字段
+        conn.execute('''
+            UPDATE table_designs_simple
+            SET design_data = json_set(design_data, '$.fields',
+                    json(coalesce((SELECT json_group_array(json(value))
+                                   FROM json_each(design_data, '$.fields')
+                                   WHERE json_extract(value, '$.name') <> ?), '[]'))),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE table_name = ?
+        ''', (field_data['name'], table_name))
+    elif operation == 'update':
+        conn.execute('''
+            UPDATE table_designs_simple
+            SET design_data = json_replace(design_data,
+                    coalesce((SELECT fullkey FROM json_each(design_data, '$.fields')
+                              WHERE json_extract(value, '$.name') = ?), '$.__noop__'), json(?)),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE table_name = ?
+        ''', (field_data['old_name'], orjson.dumps(field_data).decode(), table_name))
+
+def update_design_after_field_change(table_name, operation, field_data, conn=None):
+    """在字段变更后更新设计数据
+
+    默认入队交给后台写线程异步落库；传入conn时复用调用方的
+    连接和事务同步执行。
+    """
+    if conn is not None:
+        _design_field_change(conn, table_name, operation, field_data)
+    else:
+        _design_queue.put(('field_change', table_name, operation, field_data))
+
+# 设计库写入队列：请求路径只入队，由单个后台线程按入队顺序串行落库
+# （SQLite写本来就要串行化，异步化后请求不再等设计库的fsync）
+_design_queue = queue.Queue()
+_DESIGN_FLUSH_INTERVAL = 0.05  # 批量提交窗口（秒）
+
+def _apply_design_op(conn, op):
+    kind = op[0]
+    if kind == 'save':
+        _design_save(conn, op[1])
+    elif kind == 'delete':
+        _design_delete(conn, op[1])
+    elif kind == 'field_change':
+        _design_field_change(conn, op[1], op[2], op[3])
+
+def _design_writer():
+    """后台单写线程：按批消费设计库写操作，每批一个事务提交"""
+    conn = pool._create_connection(DESIGN_DB)
+    while True:
+        ops = [_design_queue.get()]
+        deadline = time.monotonic() + _DESIGN_FLUSH_INTERVAL
+        while True:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                ops.append(_design_queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for op in ops:
+                _apply_design_op(conn, op)
             conn.commit()
-        
-        conn.close()
-    except Exception as e:
-        print(f"更新设计数据失败: {e}")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            print(f"设计数据写入失败: {e}")
+        finally:
+            for _ in ops:
+                _design_queue.task_done()
+
+threading.Thread(target=_design_writer, name='design-writer', daemon=True).start()
+# 进程退出前冲刷尚未落库的设计变更
+atexit.register(_design_queue.join)
+
+def flush_design_writes():
+    """等待后台写线程把已入队的设计变更全部落库
+
+    读取设计数据前调用，避免读到批量窗口内尚未提交的旧数据。
+    """
+    _design_queue.join()
 
 # API路由 - 删除字段
 @app.route('/api/tables/<table_name>/fields/<field_name>', methods=['DELETE'])
 def delete_field(table_name, field_name):
     """删除表中的字段"""
-    try:
-        # SQLite不支持直接删除字段，这里采用重建表的方式
-        # 获取原表设计
-        conn_design = get_db_connection(DESIGN_DB)
+    # SQLite不支持直接删除字段，这里采用重建表的方式
+    # 获取原表设计（先冲刷写队列，保证读到最新设计）
+    flush_design_writes()
+    with pool.connection(DATABASE) as conn_design:
         c_design = conn_design.cursor()
-        c_design.execute("SELECT design_data FROM table_designs_simple WHERE table_name=?", (table_name,))
+        c_design.execute("SELECT design_data FROM design.table_designs_simple WHERE table_name=?", (table_name,))
         design_row = c_design.fetchone()
-        conn_design.close()
-        
-        if not design_row:
-            return jsonify({'success': False, 'error': '找不到表设计数据'}), 404
-        
-        design_data = json.loads(design_row[0])
-        
-        # 从设计中移除字段
-        design_data['fields'] = [f for f in design_data['fields'] if f['name'] != field_name]
-        
-        # 重建表
-        success, message = create_actual_table(design_data)
-        
-        if success:
-            return jsonify({'success': True, 'message': f'字段 {field_name} 删除成功'})
-        else:
-            return jsonify({'success': False, 'error': message}), 400
-            
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+
+    if not design_row:
+        return jsonify({'success': False, 'error': '找不到表设计数据'}), 404
+
+    design_data = orjson.loads(design_row[0])
+
+    # 从设计中移除字段
+    design_data['fields'] = [f for f in design_data['fields'] if f['name'] != field_name]
+
+    # 重建表（保留剩余同名列的数据）
+    success, message = create_actual_table(design_data, preserve_data=True)
+
+    if success:
+        # 同步持久化设计数据（SQL层JSON1删除，走后台写队列）
+        update_design_after_field_change(table_name, 'delete', {'name': field_name})
+        return jsonify({'success': True, 'message': f'字段 {field_name} 删除成功'})
+    else:
+        return jsonify({'success': False, 'error': message}), 400
 
 # API路由 - 更新字段
 @app.route('/api/tables/<table_name>/fields/<field_name>', methods=['PUT'])
 def update_field(table_name, field_name):
     """更新字段定义"""
-    try:
-        data = request.json
-        new_field_data = data.get('field')
-        
-        if not new_field_data:
-            return jsonify({'success': False, 'error': '字段数据不能为空'}), 400
-        
-        # 获取原表设计
-        conn_design = get_db_connection(DESIGN_DB)
+    data = request.json
+    new_field_data = data.get('field')
+
+    if not new_field_data:
+        return jsonify({'success': False, 'error': '字段数据不能为空'}), 400
+
+    # 获取原表设计（先冲刷写队列，保证读到最新设计）
+    flush_design_writes()
+    with pool.connection(DATABASE) as conn_design:
         c_design = conn_design.cursor()
-        c_design.execute("SELECT design_data FROM table_designs_simple WHERE table_name=?", (table_name,))
+        c_design.execute("SELECT design_data FROM design.table_designs_simple WHERE table_name=?", (table_name,))
         design_row = c_design.fetchone()
-        conn_design.close()
-        
-        if not design_row:
-            return jsonify({'success': False, 'error': '找不到表设计数据'}), 404
-        
-        design_data = json.loads(design_row[0])
-        
-        # 更新设计中的字段
-        field_updated = False
-        for i, field in enumerate(design_data['fields']):
-            if field['name'] == field_name:
-                new_field_data['old_name'] = field_name  # 记录原字段名
-                design_data['fields'][i] = new_field_data
-                field_updated = True
+
+    if not design_row:
+        return jsonify({'success': False, 'error': '找不到表设计数据'}), 404
+
+    design_data = orjson.loads(design_row[0])
+
+    # 更新设计中的字段
+    field_updated = False
+    for i, field in enumerate(design_data['fields']):
+        if field['name'] == field_name:
+            new_field_data['old_name'] = field_name  # 记录原字段名
+            design_data['fields'][i] = new_field_data
+            field_updated = True
+            break
+
+    if not field_updated:
+        return jsonify({'success': False, 'error': f'字段 {field_name} 不存在'}), 404
+
+    # 重建表（保留剩余同名列的数据）
+    success, message = create_actual_table(design_data, preserve_data=True)
+
+    if success:
+        return jsonify({'success': True, 'message': f'字段 {field_name} 更新成功'})
+    else:
+        return jsonify({'success': False, 'error': message}), 400
+
+# 识别查询语句：只看前导空白/注释之后的第一个词，不必upper()整条SQL，
+# 也不会把SELECTIVE之类的前缀误判为查询
+_SELECT_RE = re.compile(r'^\s*(?:/\*.*?\*/\s*|--[^\n]*\n\s*)*SELECT\b', re.I | re.S)
+
+# 每批取回的行数：边取边编码，避免一次性物化整个结果集
+_SQL_CHUNK_ROWS = 1000
+
+def _stream_select(conn, cursor, columns):
+    """分块取回查询结果并用orjson编码，生成一个完整的JSON响应体"""
+    try:
+        yield b'{"success": true, "columns": ' + orjson.dumps(columns) + b', "results": ['
+        # 热循环里的属性查找提升为局部变量；列名转成元组，zip逐行重建迭代器更省
+        columns = tuple(columns)
+        fetchmany = cursor.fetchmany
+        dumps = orjson.dumps
+        first = True
+        while True:
+            rows = fetchmany(_SQL_CHUNK_ROWS)
+            if not rows:
                 break
-        
-        if not field_updated:
-            return jsonify({'success': False, 'error': f'字段 {field_name} 不存在'}), 404
-        
-        # 重建表
-        success, message = create_actual_table(design_data)
-        
-        if success:
-            return jsonify({'success': True, 'message': f'字段 {field_name} 更新成功'})
-        else:
-            return jsonify({'success': False, 'error': message}), 400
-            
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+            # 去掉每块外层的[]，拼成一个大数组
+            chunk = dumps([dict(zip(columns, row)) for row in rows], default=str)[1:-1]
+            if chunk:
+                yield chunk if first else b',' + chunk
+                first = False
+        yield b']}'
+    finally:
+        pool.release(DATABASE, conn)
 
 # API路由 - 执行自定义SQL
 @app.route('/api/execute-sql', methods=['POST'])
 def execute_sql():
     """执行自定义SQL语句"""
+    data = request.json
+    sql = data.get('sql')
+
+    if not sql:
+        return jsonify({'success': False, 'error': 'SQL语句不能为空'}), 400
+
+    conn = pool.acquire(DATABASE)
     try:
-        data = request.json
-        sql = data.get('sql')
-        
-        if not sql:
-            return jsonify({'success': False, 'error': 'SQL语句不能为空'}), 400
-        
-        conn = get_db_connection(DATABASE)
         c = conn.cursor()
-        
+
         # 执行SQL
         c.execute(sql)
-        
-        # 如果是查询语句，返回结果
-        if sql.strip().upper().startswith('SELECT'):
-            results = c.fetchall()
+
+        # 如果是查询语句，流式返回结果（连接交由生成器持有，读完后归还）
+        if _SELECT_RE.match(sql):
             columns = [description[0] for description in c.description]
-            
-            formatted_results = []
-            for row in results:
-                formatted_row = {}
-                for i, value in enumerate(row):
-                    formatted_row[columns[i]] = value
-                formatted_results.append(formatted_row)
-            
-            conn.close()
-            return jsonify({'success': True, 'results': formatted_results, 'columns': columns})
-        else:
-            # 对于非查询语句，返回影响的行数
-            conn.commit()
-            conn.close()
-            return jsonify({'success': True, 'message': 'SQL执行成功', 'rows_affected': c.rowcount})
-        
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+            return Response(_stream_select(conn, c, columns), mimetype='application/json')
+
+        # 对于非查询语句，返回影响的行数
+        conn.commit()
+        rows_affected = c.rowcount
+        # DDL可能改了表结构，mtime缓存键在WAL下不可靠，显式失效结构缓存
+        invalidate_structure_cache()
+    except Exception:
+        pool.release(DATABASE, conn)
+        raise
+    pool.release(DATABASE, conn)
+
+    return Response(orjson.dumps({'success': True, 'message': 'SQL执行成功', 'rows_affected': rows_affected}),
+                    mimetype='application/json')
 
 # API路由 - 获取数据库状态
 @app.route('/api/database-status', methods=['GET'])
 def get_database_status():
-    """获取数据库状态信息"""
-    try:
-        conn = get_db_connection(DATABASE)
+    """获取数据库状态信息（带1秒TTL缓存，DDL时主动失效）"""
+    global _status_cache
+    deadline, payload = _status_cache
+    if payload is not None and time.monotonic() < deadline:
+        return jsonify(payload)
+
+    with pool.connection(DATABASE) as conn:
         c = conn.cursor()
-        
+
         # 获取所有表
         c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
         tables = [table[0] for table in c.fetchall()]
-        
-        # 获取数据库大小
-        db_file = os.path.getsize(DATABASE)
-        
-        conn.close()
-        
-        return jsonify({
-            'success': True,
-            'tables_count': len(tables),
-            'tables': tables,
-            'database_size': db_file,
-            'last_updated': datetime.now().isoformat()
-        })
-        
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+
+        # 页数×页大小即库文件大小，省掉一次stat系统调用
+        page_count = c.execute("PRAGMA page_count").fetchone()[0]
+        page_size = c.execute("PRAGMA page_size").fetchone()[0]
+
+    payload = {
+        'success': True,
+        'tables_count': len(tables),
+        'tables': tables,
+        'database_size': page_count * page_size,
+        'last_updated': datetime.now().isoformat()
+    }
+    _status_cache = (time.monotonic() + _STATUS_TTL, payload)
+    return jsonify(payload)
+
+# 模块导入时初始化：gunicorn等WSGI服务器不经过__main__入口。
+# DDL全部是IF NOT EXISTS，多worker并发导入时由busy_timeout串行化。
+init_databases()
 
 if __name__ == '__main__':
-    init_databases()
     print("数据库初始化完成")
     print("API服务启动在 http://localhost:5000")
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # 开发模式入口。生产环境用线程化WSGI服务器，让WAL的并发读真正生效：
+    #   gunicorn -w 1 --worker-class gthread --threads 8 -b 0.0.0.0:5000 app:app
+    app.run(debug=True, host='0.0.0.0', port=5000, threaded=True)
\ No newline at end of file